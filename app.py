@@ -1,41 +1,115 @@
+# gevent が利用可能な場合は、標準ライブラリを読み込む前にパッチを当てる
+# (subprocessのパイプ読み込み中も他のリクエストを処理できるようにするため)
+try:
+    from gevent import monkey
+    monkey.patch_all()
+    from gevent.pywsgi import WSGIServer
+except ImportError:
+    WSGIServer = None
+
 import subprocess
 import os
 import json
-from flask import Flask, jsonify, render_template, request, abort
+import csv
+import io
+import time
+import threading
+import ctypes
+import atexit
+import queue
+import tempfile
+import logging
+from pathlib import Path
+from flask import Flask, Response, jsonify, render_template, request, abort
+
+# orjson が利用可能な場合は高速なC実装でシリアライズする
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- 設定 ---
 PORT = 9999
 SECRET_PATH = "remote-admin-xxxx" # 必ずユニークな文字列に変更してください
 CONFIG_FILE = "config.json"
 PID_FILE = "processes.json"
+STATUS_CACHE_TTL = 0.5 # /status の結果をキャッシュする秒数
+SAVE_DELAY = 0.2 # 変更をまとめてファイルに書き込むまでの待ち時間 (秒)
+SAVE_RETRY_MAX_DELAY = 60 # 保存に失敗したときの再試行間隔の上限 (秒)
+STATUS_PUSH_INTERVAL = 1.0 # /events の接続先へステータスを確認・送信する間隔 (秒)
+SSE_KEEPALIVE = 15 # /events で変化がない場合に接続維持用のコメントを送る間隔 (秒)
 
 
 # --- アプリケーション本体 ---
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
 # --- ヘルパー関数 (ファイルI/O) ---
 
-def load_json_file(filename, default_data={}):
-    """JSONファイルを読み込む"""
+def _dumps(data):
+    """データをコンパクトなUTF-8のJSONバイト列に変換する"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _loads(raw):
+    """JSONバイト列を読み込む"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+def load_json_file(filename, default_data=None):
+    """JSONファイルを読み込む (読み込めない場合は default_data か、新しい空の辞書を返す)"""
+    if default_data is None:
+        # 呼び出しごとに別の辞書を返す (config と processes が同じ辞書を共有しないように)
+        default_data = {}
     if not os.path.exists(filename):
         return default_data
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
+        with open(filename, 'rb') as f:
+            return _loads(f.read())
+    except (ValueError, IOError):
         return default_data
 
 def save_json_file(filename, data):
-    """JSONファイルに保存する"""
+    """JSONファイルに保存する
+
+    同じディレクトリの一時ファイルに書き込んでから os.replace で置き換えるため、
+    書き込み中にクラッシュしても元のファイルが壊れることはない
+    """
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(filename) + '.', suffix='.tmp', dir=os.path.dirname(os.path.abspath(filename)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_dumps(data))
+        os.replace(tmp, filename)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def _try_save_json_file(filename, data):
+    """JSONファイルに保存し、失敗した場合はログに記録して False を返す"""
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-    except IOError as e:
-        print(f"Error saving {filename}: {e}")
+        save_json_file(filename, data)
+        return True
+    except OSError:
+        logger.exception("Error saving %s", filename)
+        return False
+
+# /apps のレスポンス (シリアライズ済みのバイト列)。設定が変わるまで使い回す
+_apps_cached_body = None
+
+def _invalidate_apps_cache():
+    """設定が変化したときに /apps のキャッシュを破棄する"""
+    global _apps_cached_body
+    _apps_cached_body = None
 
 def load_and_migrate_config():
     """設定をロードし、古い形式の場合は新しい形式に移行する"""
+    _invalidate_apps_cache()
     config = load_json_file(CONFIG_FILE)
     # 古い形式（ルートが辞書で、'apps'キーがない）か、空の場合
     if not isinstance(config, dict) or 'apps' not in config:
@@ -44,12 +118,12 @@ def load_and_migrate_config():
             "apps": config if isinstance(config, dict) else {},
             "order": list(config.keys()) if isinstance(config, dict) else []
         }
-        save_json_file(CONFIG_FILE, new_config)
+        _try_save_json_file(CONFIG_FILE, new_config)
         return new_config
     # orderキーがない場合は追加
     if 'order' not in config:
         config['order'] = list(config.get('apps', {}).keys())
-        save_json_file(CONFIG_FILE, config)
+        _try_save_json_file(CONFIG_FILE, config)
     
     # データの整合性を確認
     app_keys = set(config.get('apps', {}).keys())
@@ -57,14 +131,178 @@ def load_and_migrate_config():
     if app_keys != order_keys:
         print("Inconsistency found between apps and order. Rebuilding order.")
         config['order'] = list(app_keys)
-        save_json_file(CONFIG_FILE, config)
+        _try_save_json_file(CONFIG_FILE, config)
 
     return config
 
+# --- ヘルパー関数 (プロセス監視) ---
+
+SYNCHRONIZE = 0x00100000
+WAIT_TIMEOUT = 0x00000102
+ERROR_ACCESS_DENIED = 5
+
+# kernel32 を読み込めない場合 (Windows以外や、関数が見つからない場合など) は、
+# tasklist を使う _get_alive_pids にフォールバックする
+try:
+    from ctypes import wintypes
+    _k32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _k32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+    _k32.OpenProcess.restype = wintypes.HANDLE
+    _k32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+    _k32.WaitForSingleObject.restype = wintypes.DWORD
+    _k32.CloseHandle.argtypes = [wintypes.HANDLE]
+    _k32.CloseHandle.restype = wintypes.BOOL
+    _k32.CreateJobObjectW.argtypes = [wintypes.LPVOID, wintypes.LPCWSTR]
+    _k32.CreateJobObjectW.restype = wintypes.HANDLE
+    _k32.AssignProcessToJobObject.argtypes = [wintypes.HANDLE, wintypes.HANDLE]
+    _k32.AssignProcessToJobObject.restype = wintypes.BOOL
+    _k32.TerminateJobObject.argtypes = [wintypes.HANDLE, wintypes.UINT]
+    _k32.TerminateJobObject.restype = wintypes.BOOL
+except (AttributeError, OSError):
+    _k32 = None
+
+def _alive(pid):
+    """PIDのプロセスが実行中かどうかをWin32 APIで確認する (APIが使えない場合のみtasklistで確認する)"""
+    if _k32 is None:
+        return pid in _get_alive_pids()
+    h = _k32.OpenProcess(SYNCHRONIZE, False, pid)
+    if not h:
+        # 権限不足で開けない場合でも、プロセス自体は存在している
+        return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+    try:
+        return _k32.WaitForSingleObject(h, 0) == WAIT_TIMEOUT
+    finally:
+        _k32.CloseHandle(h)
+
+def _create_job(proc):
+    """起動したプロセスをジョブオブジェクトに入れ、そのハンドルを返す (失敗した場合はNone)
+
+    ジョブに入れておくと、子プロセスも含めてTerminateJobObjectで一度に停止できる。
+    サーバーを再起動してもアプリは動き続けるように、KILL_ON_JOB_CLOSE は設定しない。
+
+    注意: ジョブへの割り当ては Popen から戻った後に行うため、それより前に .bat が
+    起動した子プロセスはジョブに入らず、TerminateJobObject では停止されない
+    (Popen からは一時停止状態で起動したプロセスを再開する手段がないため)
+    """
+    if _k32 is None:
+        return None
+    job = _k32.CreateJobObjectW(None, None)
+    if not job:
+        return None
+    if not _k32.AssignProcessToJobObject(job, int(proc._handle)):
+        _k32.CloseHandle(job)
+        return None
+    return job
+
+def _get_alive_pid_set(pids):
+    """与えられたPIDのうち、実行中のものを集合で返す"""
+    pids = set(pids)
+    if not pids:
+        return set()
+    if _k32 is None:
+        return _get_alive_pids() & pids
+    return {pid for pid in pids if _alive(pid)}
+
+def _get_alive_pids():
+    """実行中の全プロセスのPIDを1回のtasklist呼び出しで取得する (Win32 APIが使えない場合のフォールバック)"""
+    try:
+        result = subprocess.run(['tasklist', '/FO', 'CSV', '/NH'], capture_output=True, text=True, errors='replace', check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return set()
+    alive = set()
+    for row in csv.reader(io.StringIO(result.stdout)):
+        # 行の形式: "イメージ名","PID","セッション名","セッション#","メモリ使用量"
+        if len(row) > 1 and row[1].isdigit():
+            alive.add(int(row[1]))
+    return alive
+
 # --- グローバル変数の初期化 ---
 
 app_config = load_and_migrate_config()
+# ルートから頻繁に参照するため、apps と order への参照を保持しておく
+# (app_config 全体を置き換える場合は、この2つも再設定すること)
+apps_dict = app_config['apps']
+order_list = app_config['order']
 processes = load_json_file(PID_FILE)
+# app_config と processes はメモリ上のものが常に正であり、ファイルは起動時にのみ読み込む。
+# リクエストと書き込みスレッドが並行して触るため、変更はこのロックの中で行う
+_state_lock = threading.Lock()
+# 起動確認から起動までをまとめて行うためのロック (連打で二重に起動しないように)
+_start_lock = threading.Lock()
+# アプリ名 -> ジョブオブジェクトのハンドル (このサーバーで起動したアプリのみ。保存はしない)
+_jobs = {}
+
+# /status のレスポンスキャッシュ (短時間の連続ポーリングをまとめる)
+_status_cache = {"ts": 0.0, "key": None, "body": None}
+_status_lock = threading.Lock()
+
+def _invalidate_status_cache():
+    """状態が変化したときに /status のキャッシュを破棄する"""
+    _status_cache["ts"] = 0.0
+
+# --- 遅延書き込み ---
+# 変更のたびにファイルを書き換えず、SAVE_DELAY の間の変更を1回の書き込みにまとめる
+
+_due = {} # ファイル名 -> 書き込む予定の時刻 (time.monotonic)。保存待ちのファイルだけが入る
+_save_failures = {} # ファイル名 -> 連続して保存に失敗した回数
+_save_cv = threading.Condition()
+
+def _data_for(filename):
+    """ファイル名に対応するメモリ上のデータを返す"""
+    return app_config if filename == CONFIG_FILE else processes
+
+def mark_dirty(filename):
+    """ファイルへの保存を予約する"""
+    with _save_cv:
+        # 再試行待ちの場合は、その予定時刻を前倒ししない
+        _due.setdefault(filename, time.monotonic() + SAVE_DELAY)
+        _save_cv.notify()
+
+def flush_now(force=False):
+    """予定時刻を過ぎた保存を実行する (force=True の場合は予約されているものをすべて実行する)"""
+    with _save_cv:
+        now = time.monotonic()
+        pending = [filename for filename, due in _due.items() if force or due <= now]
+        for filename in pending:
+            del _due[filename]
+    for filename in pending:
+        try:
+            with _state_lock:
+                save_json_file(filename, _data_for(filename))
+        except OSError as e:
+            # ウイルス対策ソフトやエディタがファイルを開いていると os.replace が失敗することがあるため、
+            # 間隔を倍々に空けながら (上限 SAVE_RETRY_MAX_DELAY) 再試行する
+            with _save_cv:
+                failures = _save_failures.get(filename, 0) + 1
+                _save_failures[filename] = failures
+                delay = min(SAVE_DELAY * 2 ** failures, SAVE_RETRY_MAX_DELAY)
+                _due[filename] = time.monotonic() + delay
+            if failures == 1:
+                logger.exception("Error saving %s. Retrying in %.1f s.", filename, delay)
+            else:
+                logger.warning("Still unable to save %s (%d attempts): %s. Retrying in %.1f s.", filename, failures, e, delay)
+            continue
+        with _save_cv:
+            failures = _save_failures.pop(filename, 0)
+        if failures:
+            logger.warning("Saved %s after %d failed attempts.", filename, failures)
+
+def _flusher():
+    """保存の予定時刻まで待ち、その時点までの変更をまとめて書き込む"""
+    while True:
+        with _save_cv:
+            while True:
+                if not _due:
+                    _save_cv.wait()
+                    continue
+                delay = min(_due.values()) - time.monotonic()
+                if delay <= 0:
+                    break
+                _save_cv.wait(delay)
+        flush_now()
+
+threading.Thread(target=_flusher, daemon=True).start()
+atexit.register(flush_now, True)
 
 
 # --- API Endpoints ---
@@ -74,60 +312,188 @@ def index():
     """メインのHTMLページを返す"""
     return render_template('index.html', SECRET_PATH=SECRET_PATH)
 
+def _rebuild_apps_cache():
+    """現在の設定から /apps のレスポンスを作り直す"""
+    global _apps_cached_body
+    with _state_lock:
+        body = _dumps(app_config)
+        _apps_cached_body = body
+    # ロック解放後に無効化されても None を返さないよう、グローバル変数ではなく手元の値を返す
+    return body
+
 @app.route('/apps')
 def get_apps():
     """設定されているアプリケーションの一覧を返す"""
-    return jsonify(app_config)
+    return Response(_apps_cached_body or _rebuild_apps_cache(), mimetype='application/json')
 
-@app.route('/status')
-def get_status():
-    """全アプリケーションのステータスを返す"""
-    global processes
-    current_status = {}
-    apps_to_remove_pid = []
+def _compute_status():
+    """全アプリケーションのステータスを計算し、停止済みのPIDを削除する
 
-    for app_name, app_info in app_config.get('apps', {}).items():
-        pid = processes.get(app_name)
-        is_running = False
-        if pid:
-            try:
-                result = subprocess.run(['tasklist', '/FI', f'PID eq {pid}'], capture_output=True, text=True, check=True)
-                if str(pid) in result.stdout:
-                    is_running = True
-                else:
-                    apps_to_remove_pid.append(app_name)
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                apps_to_remove_pid.append(app_name)
-        
-        current_status[app_name] = {
-            "running": is_running,
-            "pid": pid if is_running else None,
-            "port": app_info.get("port")
+    ステータスと、その計算に使ったPIDの集合 (/status のキャッシュキー) を返す
+    """
+    global processes
+    with _state_lock:
+        tracked = dict(processes)
+    alive_pids = _get_alive_pid_set(tracked.values())
+    running = {name: pid for name, pid in tracked.items() if pid in alive_pids}
+
+    with _state_lock:
+        # 停止済みのPIDを1回でまとめて取り除く (確認中に再起動されたアプリのPIDは残す)
+        kept = {name: pid for name, pid in processes.items() if pid in alive_pids or tracked.get(name) != pid}
+        if len(kept) != len(processes):
+            for name in processes.keys() - kept.keys():
+                job = _jobs.pop(name, None)
+                if job is not None:
+                    _k32.CloseHandle(job)
+            processes = kept
+            mark_dirty(PID_FILE)
+
+        # apps_dict は add_app / delete_app がロック内で変更するため、ロック内で走査する
+        status = {
+            app_name: {
+                "running": app_name in running,
+                "pid": running.get(app_name),
+                "port": app_info.get("port")
+            }
+            for app_name, app_info in apps_dict.items()
         }
 
-    if apps_to_remove_pid:
-        for app_name in apps_to_remove_pid:
-            if app_name in processes:
-                del processes[app_name]
-        save_json_file(PID_FILE, processes)
+    # スイープ後に残る、確認済みのPIDだけをキーにする
+    # (確認中に起動されたPIDはキーに含めず、次の呼び出しで再計算させる)
+    return status, frozenset(running.items())
+
+def _status_key():
+    """/status のキャッシュキー (追跡中のPIDの集合)"""
+    with _state_lock:
+        return frozenset(processes.items())
+
+def _status_body():
+    """全アプリケーションのステータスをJSONバイト列で返す (STATUS_CACHE_TTL の間はキャッシュを使う)"""
+    key = _status_key()
+    if time.monotonic() - _status_cache["ts"] < STATUS_CACHE_TTL and _status_cache["key"] == key:
+        return _status_cache["body"]
+
+    with _status_lock:
+        # ロック待ちの間に他のリクエストが再計算していればそれを使う
+        key = _status_key()
+        if time.monotonic() - _status_cache["ts"] < STATUS_CACHE_TTL and _status_cache["key"] == key:
+            return _status_cache["body"]
+        status, key = _compute_status()
+        body = _dumps(status)
+        _status_cache["body"] = body
+        _status_cache["key"] = key
+        _status_cache["ts"] = time.monotonic()
+        return body
 
-    return jsonify(current_status)
+@app.route('/status')
+def get_status():
+    """全アプリケーションのステータスを返す"""
+    return Response(_status_body(), mimetype='application/json')
+
+# --- ステータスの配信 (Server-Sent Events) ---
+# 接続中のクライアントごとにキューを持ち、1つのスレッドがまとめてステータスを確認して配る
+
+_subscribers = set()
+_subscribers_lock = threading.Lock()
+
+def _status_broadcaster():
+    """STATUS_PUSH_INTERVAL ごとにステータスを確認し、変化があれば全クライアントに送る"""
+    last_body = None
+    while True:
+        time.sleep(STATUS_PUSH_INTERVAL)
+        with _subscribers_lock:
+            subscribers = list(_subscribers)
+        if not subscribers:
+            last_body = None
+            continue
+        # 1回の失敗で配信スレッドが止まらないように、例外は記録して次の周期に進む
+        try:
+            body = _status_body()
+            if body == last_body:
+                continue
+            last_body = body
+            for q in subscribers:
+                # 受信が追いつかないクライアントには、未送信の古いステータスを捨てて最新のものだけを送る
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+                q.put_nowait(body)
+        except Exception:
+            logger.exception("Error broadcasting status")
+
+threading.Thread(target=_status_broadcaster, daemon=True).start()
+
+@app.route('/events')
+def status_events():
+    """ステータスの変化を text/event-stream で配信する"""
+    def stream():
+        q = queue.Queue(maxsize=1)
+        with _subscribers_lock:
+            _subscribers.add(q)
+        try:
+            yield f"data: {_status_body().decode('utf-8')}\n\n"
+            while True:
+                try:
+                    body = q.get(timeout=SSE_KEEPALIVE)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {body.decode('utf-8')}\n\n"
+        finally:
+            with _subscribers_lock:
+                _subscribers.discard(q)
+
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+def _untrack(app_name, pid=None):
+    """アプリの追跡をやめ、ジョブのハンドルを閉じる (_state_lock を取得した状態で呼ぶ)
+
+    pid を指定した場合は、追跡中のPIDがそれと一致するときだけ追跡をやめる
+    (停止処理の間に再起動されたアプリの新しいPIDを消さないため)
+    """
+    if pid is not None and processes.get(app_name) != pid:
+        return
+    if processes.pop(app_name, None) is not None:
+        mark_dirty(PID_FILE)
+    job = _jobs.pop(app_name, None)
+    if job is not None:
+        _k32.CloseHandle(job)
 
 def _stop_process(app_name):
     """Internal helper to stop a process and update state."""
-    pid = processes.get(app_name)
+    with _state_lock:
+        pid = processes.get(app_name)
+        job = _jobs.pop(app_name, None)
     if pid is None:
+        if job is not None:
+            _k32.CloseHandle(job)
         return True, f"{app_name} is not running or not tracked."
+
+    # このサーバーで起動したアプリは、ジョブごと子プロセスも含めて停止する
+    # (ジョブへの割り当て前に起動された子プロセスは対象外。_create_job を参照)
+    if job is not None:
+        terminated = _k32.TerminateJobObject(job, 1)
+        _k32.CloseHandle(job)
+        if terminated:
+            with _state_lock:
+                _untrack(app_name, pid)
+            _invalidate_status_cache()
+            return True, f"Sent stop signal to {app_name} (PID: {pid})."
+
+    # 以前のサーバーで起動したアプリなど、ジョブがない場合はtaskkillで停止する
     try:
         subprocess.run(['taskkill', '/F', '/PID', str(pid), '/T'], check=True, capture_output=True, text=True)
-        del processes[app_name]
-        save_json_file(PID_FILE, processes)
+        with _state_lock:
+            _untrack(app_name, pid)
+        _invalidate_status_cache()
         return True, f"Sent stop signal to {app_name} (PID: {pid})."
     except subprocess.CalledProcessError as e:
-        if "not found" in e.stderr.lower():
-            if app_name in processes:
-                del processes[app_name]
-                save_json_file(PID_FILE, processes)
+        # エラーメッセージはOSの言語によって変わるため、プロセスの有無で判定する
+        if not _alive(pid):
+            with _state_lock:
+                _untrack(app_name, pid)
+            _invalidate_status_cache()
             return True, f"Process for {app_name} (PID: {pid}) not found. Already stopped."
         else:
             return False, f"Failed to stop {app_name}: {e.stderr}"
@@ -145,11 +511,12 @@ def add_app():
     path = data['path']
     port = data.get('port')
 
-    if name in app_config['apps']:
+    if name in apps_dict:
         return jsonify({"error": f"Application '{name}' already exists."}), 409
-    if not path.endswith('.bat') or not os.path.isabs(path):
+    p = Path(path)
+    if p.suffix.lower() != '.bat' or not p.is_absolute():
         return jsonify({"error": "Invalid path. Please provide an absolute path to a .bat file."}), 400
-    if not os.path.exists(path):
+    if not p.exists():
         return jsonify({"error": f"File not found at path: {path}"}), 400
 
     try:
@@ -157,33 +524,38 @@ def add_app():
     except (ValueError, TypeError):
         return jsonify({"error": f"Invalid port number: {port}"}), 400
 
-    app_config['apps'][name] = {
-        "path": path,
-        "cwd": os.path.dirname(path),
-        "port": port_int
-    }
-    app_config['order'].append(name)
-    save_json_file(CONFIG_FILE, app_config)
+    with _state_lock:
+        apps_dict[name] = {
+            "path": str(p),
+            "cwd": str(p.parent),
+            "port": port_int
+        }
+        order_list.append(name)
+        mark_dirty(CONFIG_FILE)
+        _invalidate_apps_cache()
+    _invalidate_status_cache()
 
     return jsonify({"message": f"Application '{name}' added successfully."}), 201
 
 @app.route(f'/{SECRET_PATH}/delete/<app_name>', methods=['POST'])
 def delete_app(app_name):
     """アプリケーションを削除する"""
-    if app_name not in app_config['apps']:
+    if app_name not in apps_dict:
         return jsonify({"error": "Application not found"}), 404
 
     if processes.get(app_name):
         _stop_process(app_name)
 
-    del app_config['apps'][app_name]
-    if app_name in app_config['order']:
-        app_config['order'].remove(app_name)
-    save_json_file(CONFIG_FILE, app_config)
+    with _state_lock:
+        del apps_dict[app_name]
+        if app_name in order_list:
+            order_list.remove(app_name)
+        mark_dirty(CONFIG_FILE)
+        _invalidate_apps_cache()
 
-    if app_name in processes:
-        del processes[app_name]
-        save_json_file(PID_FILE, processes)
+        # 停止に失敗した場合でも追跡はやめる
+        _untrack(app_name)
+    _invalidate_status_cache()
 
     return jsonify({"message": f"Application '{app_name}' deleted."}), 200
 
@@ -196,50 +568,68 @@ def save_order():
     
     new_order = data['order']
     # 整合性チェック
-    if set(new_order) != set(app_config['apps'].keys()):
+    if set(new_order) != set(apps_dict.keys()):
         return jsonify({"error": "Order data does not match current apps"}), 400
         
-    app_config['order'] = new_order
-    save_json_file(CONFIG_FILE, app_config)
+    with _state_lock:
+        # order_list を参照し続けられるように、リストの中身だけを置き換える
+        order_list[:] = new_order
+        mark_dirty(CONFIG_FILE)
+        _invalidate_apps_cache()
     return jsonify({"status": "success"}), 200
 
-@app.route(f'/{SECRET_PATH}/start/<app_name>', methods=['POST'])
-def start_app(app_name):
-    """アプリケーションを起動する"""
-    if app_name not in app_config['apps']:
-        return jsonify({"error": "Invalid application name"}), 404
-    
+def _start_if_stopped(app_name):
+    """アプリが停止していれば起動する (_start_lock を取得した状態で呼ぶ)"""
     pid = processes.get(app_name)
     if pid:
-        try:
-            result = subprocess.run(['tasklist', '/FI', f'PID eq {pid}'], capture_output=True, text=True)
-            if str(pid) in result.stdout:
-                 return jsonify({"message": f"{app_name} is already running."}), 200
-        except subprocess.CalledProcessError:
-            pass
+        if _alive(pid):
+            return jsonify({"message": f"{app_name} is already running."}), 200
+        # 停止済みのPIDが残っている場合は追跡をやめてから起動する
+        with _state_lock:
+            _untrack(app_name, pid)
 
     try:
-        app_info = app_config['apps'][app_name]
+        app_info = apps_dict[app_name]
         abs_path = app_info['path']
         abs_cwd = app_info['cwd']
         
         if not os.path.exists(abs_path):
             return jsonify({"error": f"Batch file not found: {abs_path}"}), 500
 
-        command = ['cmd.exe', '/k', abs_path]
-        proc = subprocess.Popen(command, creationflags=subprocess.CREATE_NEW_CONSOLE, cwd=abs_cwd)
+        # .batを直接起動し、スクリプト終了時にプロセスも終了するようにする
+        # (cmd.exe /k だとスクリプト終了後もプロセスが残り、実行中と判定されてしまう)
+        command = [abs_path]
+        try:
+            proc = subprocess.Popen(command, creationflags=subprocess.CREATE_NEW_CONSOLE | subprocess.CREATE_BREAKAWAY_FROM_JOB, cwd=abs_cwd)
+        except PermissionError:
+            # 親のジョブが離脱を許可していない場合は、そのまま起動する
+            proc = subprocess.Popen(command, creationflags=subprocess.CREATE_NEW_CONSOLE, cwd=abs_cwd)
         
-        processes[app_name] = proc.pid
-        save_json_file(PID_FILE, processes)
+        job = _create_job(proc)
+        with _state_lock:
+            processes[app_name] = proc.pid
+            if job is not None:
+                _jobs[app_name] = job
+            mark_dirty(PID_FILE)
+        _invalidate_status_cache()
         
         return jsonify({"message": f"Started {app_name} with PID: {proc.pid}"}), 200
     except Exception as e:
         return jsonify({"error": f"Failed to start {app_name}: {str(e)}"}), 500
 
+@app.route(f'/{SECRET_PATH}/start/<app_name>', methods=['POST'])
+def start_app(app_name):
+    """アプリケーションを起動する"""
+    if app_name not in apps_dict:
+        return jsonify({"error": "Invalid application name"}), 404
+    
+    with _start_lock:
+        return _start_if_stopped(app_name)
+
 @app.route(f'/{SECRET_PATH}/stop/<app_name>', methods=['POST'])
 def stop_app(app_name):
     """アプリケーションを停止する"""
-    if app_name not in app_config['apps']:
+    if app_name not in apps_dict:
         return jsonify({"error": "Application not found"}), 404
         
     success, message = _stop_process(app_name)
@@ -283,4 +673,8 @@ if __name__ == '__main__':
     print(f"   http://<your-pc-ip>:{PORT}/")
     print("   (To find your PC's IP, use 'ipconfig' in cmd or 'tailscale ip' if you use it)")
     print("------------------------------------")
-    app.run(host='0.0.0.0', port=PORT, debug=False)
+    if WSGIServer is not None:
+        WSGIServer(('0.0.0.0', PORT), app).serve_forever()
+    else:
+        print("gevent is not installed. Falling back to the threaded Flask server.")
+        app.run(host='0.0.0.0', port=PORT, debug=False, threaded=True)
@@ -92,52 +92,70 @@ async function updateAppList() {
     }
 }
 
-async function updateStatus() {
-    try {
-        const data = await apiFetch('/status');
-
-        Object.keys(data).forEach(appName => {
-            const sanitizedAppName = sanitizeForId(appName);
-            const card = document.getElementById(`card-${sanitizedAppName}`);
-            if (!card) return;
-
-            const statusEl = card.querySelector(`#status-${sanitizedAppName}`);
-            const startBtn = card.querySelector('.start-btn');
-            const stopBtn = card.querySelector('.stop-btn');
-            const appLink = card.querySelector('.app-link');
-
-            const appData = data[appName];
-
-            if (appData.running) {
-                statusEl.textContent = 'Run';
-                statusEl.className = 'status status-running';
-                startBtn.classList.add('disabled');
-                stopBtn.classList.add('active');
-                if (appData.port) {
-                    appLink.href = `http://${window.location.hostname}:${appData.port}`;
-                    appLink.style.pointerEvents = 'auto';
-                    appLink.style.cursor = 'pointer';
-                } else {
-                    appLink.style.pointerEvents = 'none';
-                    appLink.style.cursor = 'default';
-                }
+function renderStatus(data) {
+    Object.keys(data).forEach(appName => {
+        const sanitizedAppName = sanitizeForId(appName);
+        const card = document.getElementById(`card-${sanitizedAppName}`);
+        if (!card) return;
+
+        const statusEl = card.querySelector(`#status-${sanitizedAppName}`);
+        const startBtn = card.querySelector('.start-btn');
+        const stopBtn = card.querySelector('.stop-btn');
+        const appLink = card.querySelector('.app-link');
+
+        const appData = data[appName];
+
+        if (appData.running) {
+            statusEl.textContent = 'Run';
+            statusEl.className = 'status status-running';
+            startBtn.classList.add('disabled');
+            stopBtn.classList.add('active');
+            if (appData.port) {
+                appLink.href = `http://${window.location.hostname}:${appData.port}`;
+                appLink.style.pointerEvents = 'auto';
+                appLink.style.cursor = 'pointer';
             } else {
-                statusEl.textContent = 'Stop';
-                statusEl.className = 'status status-stopped';
-                startBtn.classList.remove('disabled');
-                stopBtn.classList.remove('active');
-                appLink.href = '#';
                 appLink.style.pointerEvents = 'none';
                 appLink.style.cursor = 'default';
             }
-        });
+        } else {
+            statusEl.textContent = 'Stop';
+            statusEl.className = 'status status-stopped';
+            startBtn.classList.remove('disabled');
+            stopBtn.classList.remove('active');
+            appLink.href = '#';
+            appLink.style.pointerEvents = 'none';
+            appLink.style.cursor = 'default';
+        }
+    });
+}
+
+function markStatusUnknown() {
+    document.querySelectorAll('.status').forEach(el => {
+        el.textContent = 'Unknown';
+        el.className = 'status status-unknown';
+    });
+}
+
+async function updateStatus() {
+    try {
+        renderStatus(await apiFetch('/status'));
     } catch (error) {
         console.error('Failed to fetch status:', error);
-        document.querySelectorAll('.status').forEach(el => {
-            el.textContent = 'Unknown';
-            el.className = 'status status-unknown';
-        });
+        markStatusUnknown();
+    }
+}
+
+// Receive status pushes from the server instead of polling /status
+function startStatusStream() {
+    if (!window.EventSource) {
+        setInterval(updateStatus, 5000);
+        return;
     }
+    const source = new EventSource('/events');
+    source.onmessage = e => renderStatus(JSON.parse(e.data));
+    // EventSource reconnects on its own; show Unknown until it does
+    source.onerror = () => markStatusUnknown();
 }
 
 // --- Drag and Drop ---
@@ -314,5 +332,5 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // Load app data
     updateAppList();
-    setInterval(updateStatus, 5000);
+    startStatusStream();
 });